@@ -1,10 +1,11 @@
 from flask import Flask, render_template, request, jsonify
-from tasks.task1_scraper import run_scraper
-from tasks.task2_database import load_to_database
+from config import Config
+from tasks.db import get_connection, release
 from tasks.task3_api import api_bp
 import os
 
 app = Flask(__name__)
+app.config.from_object(Config)
 app.register_blueprint(api_bp)
 
 
@@ -36,6 +37,8 @@ def run_scraper_endpoint():
         city = data.get('city', '').strip()
         date_posted = data.get('date_posted', '').strip()
         max_pages = int(data.get('max_pages', 5))
+        incremental = bool(data.get('incremental', False))
+        trace_memory = bool(data.get('trace_memory', False))
         
         if not position or not city:
             return jsonify({
@@ -43,7 +46,9 @@ def run_scraper_endpoint():
                 'error': 'Position and city are required'
             }), 400
         
-        result = run_scraper(position, city, date_posted, max_pages)
+        # Scraper dependencies are imported on demand so API-only workers stay small.
+        from tasks.task1_scraper import run_scraper
+        result = run_scraper(position, city, date_posted, max_pages, incremental, trace_memory)
         
         return jsonify(result), 200
         
@@ -63,6 +68,7 @@ def load_database_endpoint():
                 'error': 'No CSV file found. Please run the scraper first.'
             }), 400
         
+        from tasks.task2_database import load_to_database
         result = load_to_database()
         
         return jsonify(result), 200
@@ -77,36 +83,28 @@ def load_database_endpoint():
 @app.route('/stats')
 def get_stats():
     """Get system statistics."""
-    import mysql.connector
-    from dotenv import load_dotenv
-    
-    load_dotenv()
-    
     stats = {
         'csv_exists': os.path.exists('indeed_jobs.csv'),
         'db_exists': False,
         'total_jobs': 0
     }
     
+    conn = None
+    cursor = None
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'jobs_db')
-        )
+        conn = get_connection()
         stats['db_exists'] = True
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) FROM jobs')
         stats['total_jobs'] = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
-    except:
+    except Exception:
         pass
+    finally:
+        release(conn, cursor)
     
     return jsonify(stats)
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='127.0.0.1', port=5000)
+    # Never bind the dev server (and its debugger) to Config.HOST: that is for gunicorn.
+    app.run(debug=Config.DEV_SERVER_DEBUG, host='127.0.0.1', port=Config.PORT)
@@ -0,0 +1,95 @@
+"""
+Benchmark for the /api/jobs serialization path.
+
+Compares the old path (per-row positional dict + Flask's jsonify, which
+sorts keys) with the column-mapped dicts, the compact array-of-arrays shape, and the effect of
+gzip/brotli compression on response size. Uses synthetic rows, so no
+database is needed:
+
+    python benchmarks/bench_serialization.py [rows]
+"""
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from tasks import serialization
+from tasks.serialization import compress, dumps, rows_to_dicts
+
+COLUMNS = ['id', 'title', 'company', 'location', 'salary', 'job_type', 'description', 'posted_date', 'job_url',
+           'scraped_at', 'salary_min', 'salary_max', 'salary_period', 'salary_annual', 'posted_at']
+
+
+def make_rows(count):
+    now = datetime(2024, 1, 1)
+    return [(
+        i,
+        f'Software Engineer {i % 50}',
+        f'Company {i % 300}',
+        'Austin, TX' if i % 2 else 'Remote',
+        '$50,000 - $70,000 a year',
+        'Full-time',
+        'Build and maintain backend services for our hiring platform. ' * 4,
+        f'Posted {i % 30} days ago',
+        f'https://www.indeed.com/viewjob?jk={i:016x}',
+        now,
+        Decimal('50000.00'),
+        Decimal('70000.00'),
+        'year',
+        Decimal('60000.00'),
+        now - timedelta(days=i % 30),
+    ) for i in range(count)]
+
+
+def legacy_dict(row):
+    return {
+        'id': row[0], 'title': row[1], 'company': row[2], 'location': row[3], 'salary': row[4],
+        'job_type': row[5], 'description': row[6], 'posted_date': row[7], 'job_url': row[8],
+        'scraped_at': row[9], 'salary_min': row[10], 'salary_max': row[11], 'salary_period': row[12],
+        'salary_annual': row[13], 'posted_at': row[14],
+    }
+
+
+def legacy(rows):
+    jobs = [legacy_dict(row) for row in rows]
+    with app.app_context():
+        return app.json.response({'success': True, 'count': len(jobs), 'jobs': jobs}).get_data()
+
+
+def mapped(rows):
+    return dumps({'success': True, 'count': len(rows), 'jobs': rows_to_dicts(rows, COLUMNS)})
+
+
+def compact(rows):
+    return dumps({'success': True, 'count': len(rows), 'columns': COLUMNS, 'jobs': rows})
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = make_rows(count)
+    encoder = 'orjson' if serialization.orjson is not None else 'json'
+    print(f'{count} rows, encoder: {encoder}, brotli: {serialization.brotli is not None}')
+
+    baseline = None
+    for name, func in [('legacy jsonify', legacy), ('mapped dict', mapped), ('compact arrays', compact)]:
+        best = min(timeit.repeat(lambda: func(rows), number=1, repeat=5))
+        baseline = baseline or best
+        print(f'{name:<20} {best * 1000:8.1f} ms  {baseline / best:5.2f}x  {len(func(rows)):>10} bytes')
+
+    for name, func in [('mapped dict', mapped), ('compact arrays', compact)]:
+        body = func(rows)
+        for accept in ['gzip', 'br']:
+            compressed, encoding = compress(body, accept)
+            if encoding != accept:
+                continue
+            best = min(timeit.repeat(lambda: compress(body, accept), number=1, repeat=3))
+            print(f'{name:<20} {encoding:<5} {len(compressed):>10} bytes  '
+                  f'{len(body) / len(compressed):5.1f}x smaller  {best * 1000:6.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark for app startup cost.
+
+Measures, in a fresh interpreter each time, how long importing the app
+takes and the resulting RSS, then the same after the scraper and database
+loader modules have been pulled in (what every worker paid before they
+were imported lazily). Optionally starts gunicorn and reports per-worker RSS:
+
+    python benchmarks/bench_startup.py [--gunicorn]
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import resource, time
+start = time.perf_counter()
+import app
+{extra}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+CASES = [
+    ('api only (lazy imports)', ''),
+    ('with scraper + loader', 'import tasks.task1_scraper, tasks.task2_database'),
+]
+
+
+def probe(extra, repeat=5):
+    timings, rss = [], []
+    for _ in range(repeat):
+        out = subprocess.check_output([sys.executable, '-c', PROBE.format(extra=extra)], cwd=ROOT, text=True)
+        elapsed, maxrss = out.split()
+        timings.append(float(elapsed))
+        rss.append(int(maxrss))
+    return min(timings), min(rss)
+
+
+def rss_kb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def bench_gunicorn():
+    env = dict(os.environ, WEB_CONCURRENCY='4', PORT='5099')
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(3)
+        children = subprocess.check_output(['pgrep', '-P', str(proc.pid)], text=True).split()
+        print(f'gunicorn master RSS {rss_kb(proc.pid) / 1024:.1f} MB')
+        for pid in children:
+            print(f'  worker {pid} RSS {rss_kb(pid) / 1024:.1f} MB')
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    for name, extra in CASES:
+        elapsed, maxrss = probe(extra)
+        print(f'{name:<26} {elapsed * 1000:7.1f} ms  {maxrss / 1024:6.1f} MB max RSS')
+    if '--gunicorn' in sys.argv:
+        bench_gunicorn()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Application configuration.
+
+Reads the .env file and environment exactly once at import; every other
+module takes its settings from Config instead of calling os.getenv itself.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Config:
+    DB_HOST = os.getenv('DB_HOST', 'localhost')
+    DB_PORT = int(os.getenv('DB_PORT', 3306))
+    DB_USER = os.getenv('DB_USER', 'root')
+    DB_PASSWORD = os.getenv('DB_PASSWORD', '')
+    DB_NAME = os.getenv('DB_NAME', 'jobs_db')
+    # Connections kept open by each worker process; should be >= WORKER_THREADS.
+    # The pool opens them all up front, so WORKERS * DB_POOL_SIZE must stay below
+    # MySQL's max_connections (151 by default) with room for migrate.py and the CSV loader.
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 4))
+
+    # Address gunicorn binds to. `python app.py` always stays on 127.0.0.1.
+    HOST = os.getenv('HOST', '127.0.0.1')
+    PORT = int(os.getenv('PORT', 5000))
+    # Applies to the app under gunicorn, so it is off unless asked for.
+    DEBUG = os.getenv('FLASK_DEBUG', '0') == '1'
+    # `python app.py` keeps the dev server's debugger/reloader unless FLASK_DEBUG=0.
+    DEV_SERVER_DEBUG = os.getenv('FLASK_DEBUG', '1') == '1'
+
+    # Capped so the default stays well inside max_connections on large hosts.
+    WORKERS = int(os.getenv('WEB_CONCURRENCY', min((os.cpu_count() or 1) * 2 + 1, 8)))
+    WORKER_THREADS = int(os.getenv('WORKER_THREADS', 4))
+    WORKER_TIMEOUT = int(os.getenv('WORKER_TIMEOUT', 120))
@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for production serving.
+
+The app is imported once in the master (preload_app) and shared with the
+forked workers copy-on-write; each worker then opens its own DB pool.
+"""
+from config import Config
+
+bind = f'{Config.HOST}:{Config.PORT}'
+workers = Config.WORKERS
+worker_class = 'gthread'
+threads = Config.WORKER_THREADS
+timeout = Config.WORKER_TIMEOUT
+preload_app = True
+
+
+def post_fork(server, worker):
+    from tasks.db import reset_pool
+    reset_pool()
@@ -1,51 +1,46 @@
 """
 Database Migration Script
-Creates the database and table if they don't exist
+Creates the database if it doesn't exist and applies pending schema migrations
 """
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from config import Config
+from tasks.dedupe import index_missing
+from tasks.migrations import run_migrations
 
-load_dotenv()
 
 def create_database():
-    """Create database if it doesn't exist"""
+    """Create database if it doesn't exist and bring its schema up to date"""
     try:
         connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD')
+            host=Config.DB_HOST,
+            port=Config.DB_PORT,
+            user=Config.DB_USER,
+            password=Config.DB_PASSWORD
         )
         
         cursor = connection.cursor()
-        db_name = os.getenv('DB_NAME', 'jobs_db')
+        db_name = Config.DB_NAME
         
         cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
         
         # Switch to the database
         cursor.execute(f"USE {db_name}")
-        
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            title VARCHAR(255) NOT NULL,
-            company VARCHAR(255),
-            location VARCHAR(255),
-            salary VARCHAR(255),
-            job_type VARCHAR(100),
-            description TEXT,
-            posted_date VARCHAR(100),
-            job_url TEXT,
-            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE KEY unique_job (title, company, location)
-        )
-        """
-        cursor.execute(create_table_query)
         cursor.close()
+        
+        applied = run_migrations(connection)
+        if applied:
+            print(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+        else:
+            print("Schema is up to date")
+        
+        indexed = index_missing(connection)
+        if indexed:
+            print(f"Computed near-duplicate signatures for {indexed} existing jobs")
+        
         connection.close()
         
     except mysql.connector.Error as e:
+        print(f"Migration failed: {e}")
         return False
     
     return True
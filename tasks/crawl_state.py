@@ -0,0 +1,136 @@
+"""
+Database-backed state for incremental crawls.
+
+Known postings are loaded from the jobs table (only those scraped within the
+lookback window, via the scraped_at index) and each search query keeps a
+high-water mark: the newest job key seen on its previous run.
+
+A crawl doesn't move the mark itself. It writes the new mark next to the CSV,
+together with a digest of the CSV it belongs to, and load_to_database saves
+it once those exact rows are committed, so jobs that were scraped but never
+loaded are fetched again on the next run.
+"""
+import hashlib
+import json
+import os
+from tasks.db import get_connection, release
+from tasks.job_keys import exact_key, job_key_from_url
+
+# Indeed doesn't list postings older than this, so older rows can't reappear.
+LOOKBACK_DAYS = 30
+
+
+def query_key(position, city, date_posted=""):
+    return '|'.join(part.strip().lower() for part in (position, city, date_posted or ''))
+
+
+def load_known_keys(connection, lookback_days=LOOKBACK_DAYS):
+    """Return the data-jk ids and exact keys of recently scraped jobs."""
+    cursor = connection.cursor()
+    try:
+        cursor.execute('''
+            SELECT title, company, location, job_url FROM jobs
+            WHERE scraped_at >= NOW() - INTERVAL %s DAY
+        ''', (lookback_days,))
+        known = set()
+        for title, company, location, job_url in cursor:
+            known.add(exact_key(title, company, location))
+            job_key = job_key_from_url(job_url)
+            if job_key:
+                known.add(job_key)
+        return known
+    finally:
+        cursor.close()
+
+
+def load_high_water(connection, key):
+    cursor = connection.cursor(buffered=True)
+    try:
+        cursor.execute('SELECT last_job_key FROM crawl_state WHERE query_key = %s', (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+
+
+def save_high_water(connection, key, job_key, new_jobs):
+    cursor = connection.cursor()
+    try:
+        cursor.execute('''
+            INSERT INTO crawl_state (query_key, last_job_key, last_new_jobs)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                last_job_key = VALUES(last_job_key),
+                last_new_jobs = VALUES(last_new_jobs),
+                last_crawled_at = CURRENT_TIMESTAMP
+        ''', (key, job_key, new_jobs))
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def load_crawl_state(position, city, date_posted=""):
+    """Return (known_keys, high_water) for a query."""
+    connection = None
+    try:
+        connection = get_connection()
+        key = query_key(position, city, date_posted)
+        return load_known_keys(connection), load_high_water(connection, key)
+    finally:
+        release(connection)
+
+
+def pending_mark_path(csv_file):
+    return csv_file + '.crawl.json'
+
+
+def csv_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_pending_mark(csv_file, position, city, date_posted, job_key, new_jobs):
+    """Remember the mark to save once the current contents of csv_file are loaded."""
+    with open(csv_file, 'rb') as file:
+        digest = csv_digest(file.read())
+    mark = {
+        'query_key': query_key(position, city, date_posted),
+        'job_key': job_key,
+        'new_jobs': new_jobs,
+        'csv_sha256': digest
+    }
+    with open(pending_mark_path(csv_file), 'w', encoding='utf-8') as file:
+        json.dump(mark, file)
+
+
+def clear_pending_mark(csv_file):
+    """Forget the mark for a CSV that is being replaced."""
+    if os.path.exists(pending_mark_path(csv_file)):
+        os.remove(pending_mark_path(csv_file))
+
+
+def _load_mark(csv_file):
+    try:
+        with open(pending_mark_path(csv_file), encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def read_pending_mark(csv_file, csv_data):
+    """Return the mark written for exactly these CSV bytes, or None.
+
+    Call with the bytes the loader parsed: if a crawl has replaced the CSV
+    since, its mark belongs to rows this load never saw.
+    """
+    mark = _load_mark(csv_file)
+    if mark is None or mark.get('csv_sha256') != csv_digest(csv_data):
+        return None
+    return mark
+
+
+def save_pending_mark(connection, csv_file, mark):
+    """Save a mark from read_pending_mark; call after its CSV's rows are committed."""
+    save_high_water(connection, mark['query_key'], mark['job_key'], mark['new_jobs'])
+    # Leave a newer crawl's mark in place for its own load.
+    if _load_mark(csv_file) == mark:
+        clear_pending_mark(csv_file)
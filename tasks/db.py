@@ -0,0 +1,68 @@
+"""
+Per-process MySQL connection pool.
+
+The pool is created lazily on first use and re-created if the process id
+changes, so a pool opened before gunicorn forks is never shared between
+workers.
+"""
+import os
+import threading
+from mysql.connector import Error, pooling
+from config import Config
+
+_pool = None
+_pool_pid = None
+# gthread workers serve several requests at once; only one may build the pool.
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return this process's connection pool, creating it on first use."""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            # Re-check: another thread may have built it while we waited.
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=f'jobs_{os.getpid()}',
+                    pool_size=Config.DB_POOL_SIZE,
+                    host=Config.DB_HOST,
+                    port=Config.DB_PORT,
+                    user=Config.DB_USER,
+                    password=Config.DB_PASSWORD,
+                    database=Config.DB_NAME
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def get_connection():
+    """Borrow a connection; closing it returns it to the pool."""
+    return get_pool().get_connection()
+
+
+def reset_pool():
+    """Drop the current pool so the next call opens fresh connections."""
+    global _pool, _pool_pid
+    _pool = None
+    _pool_pid = None
+
+
+def release(connection, cursor=None):
+    """Close the cursor and hand the connection back to the pool.
+
+    Call this from a finally block: a pooled connection is only returned by
+    close(), so any path that skips it shrinks the pool for good.
+    """
+    if cursor is not None:
+        try:
+            cursor.close()
+        except Error:
+            pass
+    if connection is not None:
+        try:
+            # Leftover rows from an unbuffered cursor would break the next borrower.
+            connection.consume_results()
+        except Error:
+            pass
+        connection.close()
@@ -0,0 +1,255 @@
+"""
+Near-duplicate job detection with MinHash signatures and an LSH index.
+
+Reposts of the same job often come back with a slightly different title or
+location ("Remote" vs "Remote in Austin, TX"), which slips past the exact
+(title, company, location) key. Each job gets a MinHash signature over
+character shingles of its title and description. The signature is split
+into bands and each band is hashed into a bucket key. Bucket keys are stored
+in job_lsh_buckets, so finding candidates for a new job is an indexed lookup
+of its bucket keys rather than a scan of the table. A repost is still stored,
+but linked to the original through jobs.duplicate_of.
+"""
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from tasks.job_keys import exact_key
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+# Minimum estimated Jaccard similarity for two jobs to count as the same posting.
+THRESHOLD = 0.7
+# Without a description the signature covers only the title, so require more.
+THRESHOLD_NO_DESCRIPTION = 0.9
+
+# Title words that vary between reposts without changing the job.
+TITLE_ABBREVIATIONS = {'sr': 'senior', 'jr': 'junior', 'mgr': 'manager', 'engr': 'engineer'}
+TITLE_IGNORED = {'remote', 'hybrid', 'onsite', 'on', 'site', 'a', 'an', 'and', 'the', 'of', 'in', 'for', 'at', 'with'}
+
+# Fixed seed: signatures stored by earlier crawls must stay comparable.
+_rng = np.random.default_rng(20240101)
+_A = _rng.integers(0, 2 ** 64, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 64, NUM_PERM, dtype=np.uint64)
+
+_EMPTY_SIGNATURE = np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+
+
+def _clean(text):
+    if not text or text == 'N/A':
+        return ''
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def shingle_hashes(title, description):
+    """CRC32 of every character shingle of the normalized title + description."""
+    text = ' '.join(part for part in (_clean(title), _clean(description)) if part)
+    if len(text) < SHINGLE_SIZE:
+        return np.array([zlib.crc32(text.encode())] if text else [], dtype=np.uint64)
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def signature(title, description):
+    """MinHash signature as NUM_PERM uint32 values."""
+    hashes = shingle_hashes(title, description)
+    if hashes.size == 0:
+        return _EMPTY_SIGNATURE.copy()
+    # Multiply-shift hashing; uint64 arithmetic wraps, which is what we want.
+    with np.errstate(over='ignore'):
+        permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_keys(sig):
+    """One signed 64-bit bucket key per band."""
+    bands = sig.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True)
+        for band in bands
+    ]
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def _company_key(company):
+    company = _clean(company)
+    return company or None
+
+
+def title_tokens(title):
+    """Title words with abbreviations expanded and work-mode/filler words dropped."""
+    words = (TITLE_ABBREVIATIONS.get(word, word) for word in _clean(title).split())
+    return frozenset(word for word in words if word not in TITLE_IGNORED)
+
+
+def locations_compatible(location_a, location_b):
+    """Equal, or one is a more specific form of the other ("Remote" / "Remote in Austin, TX")."""
+    a, b = set(_clean(location_a).split()), set(_clean(location_b).split())
+    if not a or not b:
+        return not a and not b
+    return a <= b or b <= a
+
+
+class IndexedJob:
+    __slots__ = ('company', 'location', 'title', 'has_description', 'signature', 'exact_key')
+
+    def __init__(self, title, company, location, description, sig):
+        self.company = _company_key(company)
+        self.location = location
+        self.title = title_tokens(title)
+        self.has_description = bool(_clean(description))
+        self.signature = sig
+        self.exact_key = exact_key(title, company, location)
+
+
+class NearDuplicateIndex:
+    """In-memory LSH index over the jobs relevant to one ingest batch."""
+
+    def __init__(self):
+        self.buckets = defaultdict(set)
+        self.entries = {}
+
+    def add(self, job_id, title, company, location, description, sig, keys):
+        self.entries[job_id] = IndexedJob(title, company, location, description, sig)
+        for band, key in enumerate(keys):
+            self.buckets[(band, key)].add(job_id)
+
+    def find(self, title, company, location, description, sig, keys):
+        """Return the id of an indexed near-duplicate of this job, or None.
+
+        LSH only proposes candidates; a match also needs the same company,
+        compatible locations, the same title words, and a similarity above
+        the threshold (a stricter one when either job has no description).
+        """
+        job = IndexedJob(title, company, location, description, sig)
+        if job.company is None:
+            return None
+
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates |= self.buckets.get((band, key), set())
+
+        best_id, best_score = None, 0.0
+        for job_id in candidates:
+            other = self.entries[job_id]
+            if other.company != job.company or other.title != job.title:
+                continue
+            if not locations_compatible(location, other.location):
+                continue
+            threshold = THRESHOLD if job.has_description and other.has_description else THRESHOLD_NO_DESCRIPTION
+            score = similarity(sig, other.signature)
+            if score >= threshold and score > best_score:
+                best_id, best_score = job_id, score
+        return best_id
+
+
+def load_index(cursor, keys_per_job, chunk_size=500):
+    """Build an index of stored jobs that share a bucket with any job in the batch."""
+    index = NearDuplicateIndex()
+    wanted = sorted({(band, key) for keys in keys_per_job for band, key in enumerate(keys)})
+
+    job_ids = set()
+    for start in range(0, len(wanted), chunk_size):
+        chunk = wanted[start:start + chunk_size]
+        placeholders = ', '.join(['(%s, %s)'] * len(chunk))
+        cursor.execute(
+            f"SELECT DISTINCT job_id FROM job_lsh_buckets WHERE (band, bucket) IN ({placeholders})",
+            [value for pair in chunk for value in pair]
+        )
+        job_ids.update(row[0] for row in cursor.fetchall())
+
+    job_ids = sorted(job_ids)
+    for start in range(0, len(job_ids), chunk_size):
+        chunk = job_ids[start:start + chunk_size]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f'''
+            SELECT m.job_id, j.title, j.company, j.location, j.description, m.signature
+            FROM job_minhash m JOIN jobs j ON j.id = m.job_id
+            WHERE m.job_id IN ({placeholders})
+        ''', chunk)
+        for job_id, title, company, location, description, blob in cursor.fetchall():
+            sig = np.frombuffer(bytes(blob), dtype=np.uint32)
+            index.add(job_id, title, company, location, description, sig, band_keys(sig))
+
+    return index
+
+
+def save_signatures(cursor, signatures):
+    """Store (job_id, signature, keys) tuples for future lookups."""
+    if not signatures:
+        return
+    cursor.executemany(
+        "INSERT INTO job_minhash (job_id, signature) VALUES (%s, %s)",
+        [(job_id, sig.tobytes()) for job_id, sig, _ in signatures]
+    )
+    cursor.executemany(
+        "INSERT INTO job_lsh_buckets (band, bucket, job_id) VALUES (%s, %s, %s)",
+        [(band, key, job_id) for job_id, _, keys in signatures for band, key in enumerate(keys)]
+    )
+
+
+def find_near_duplicate(cursor, title, company, location, description):
+    """Look up a stored near-duplicate of a single job.
+
+    Returns (job id or None, signature, bucket keys) so the caller can store
+    the signature once the job is inserted.
+    """
+    sig = signature(title, description)
+    keys = band_keys(sig)
+    match = load_index(cursor, [keys]).find(title, company, location, description, sig, keys)
+    return match, sig, keys
+
+
+def reindex_job(cursor, job_id):
+    """Replace a job's stored signature after its title or description changed."""
+    cursor.execute("DELETE FROM job_lsh_buckets WHERE job_id = %s", (job_id,))
+    cursor.execute("DELETE FROM job_minhash WHERE job_id = %s", (job_id,))
+    cursor.execute("SELECT title, description, duplicate_of FROM jobs WHERE id = %s", (job_id,))
+    rows = cursor.fetchall()
+    if rows and rows[0][2] is None:
+        title, description, _ = rows[0]
+        sig = signature(title, description)
+        save_signatures(cursor, [(job_id, sig, band_keys(sig))])
+
+
+def index_missing(connection, batch_size=1000):
+    """Compute and store signatures for jobs that don't have one yet.
+
+    Ingest and the API store signatures as they write, so this is only a
+    backfill for rows from before near-duplicate detection; migrate.py runs
+    it. Rows linked to another job through duplicate_of are not indexed, so
+    later reposts always link to the original. Returns the number of jobs
+    indexed.
+    """
+    cursor = connection.cursor()
+    total = 0
+    try:
+        while True:
+            cursor.execute('''
+                SELECT j.id, j.title, j.description
+                FROM jobs j LEFT JOIN job_minhash m ON m.job_id = j.id
+                WHERE m.job_id IS NULL AND j.duplicate_of IS NULL
+                LIMIT %s
+            ''', (batch_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                return total
+
+            signatures = []
+            for job_id, title, description in rows:
+                sig = signature(title, description)
+                signatures.append((job_id, sig, band_keys(sig)))
+            save_signatures(cursor, signatures)
+            connection.commit()
+            total += len(rows)
+    finally:
+        cursor.close()
@@ -0,0 +1,18 @@
+"""
+Keys that identify a job posting, shared by the scraper, the crawl state
+and the CSV loader.
+"""
+from urllib.parse import urlparse, parse_qs
+
+
+def job_key_from_url(url):
+    """Return Indeed's job id (the jk parameter) from a job URL, if present."""
+    if not url or url == 'N/A':
+        return None
+    values = parse_qs(urlparse(url).query).get('jk')
+    return values[0] if values else None
+
+
+def exact_key(title, company, location):
+    """The unique_job key as MySQL's case-insensitive collation compares it."""
+    return tuple((value or '').strip().lower() for value in (title, company, location))
@@ -0,0 +1,237 @@
+"""
+Versioned schema migrations for the jobs database.
+
+This is the only place the schema is defined. Each migration is a function
+registered with @migration(version, description); run_migrations() applies
+the ones newer than the version recorded in the schema_migrations table.
+Migrations check for existing columns and indexes so they also bring
+databases created before versioning up to date. Only migrate.py applies
+them; the app checks the version and refuses to load into an old schema.
+"""
+from mysql.connector import Error
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return register
+
+
+def _column_exists(cursor, column):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jobs' AND COLUMN_NAME = %s",
+        (column,)
+    )
+    return cursor.fetchone() is not None
+
+
+def _index_exists(cursor, index):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jobs' AND INDEX_NAME = %s LIMIT 1",
+        (index,)
+    )
+    return cursor.fetchone() is not None
+
+
+def add_column(cursor, column, definition):
+    if not _column_exists(cursor, column):
+        cursor.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+
+def add_index(cursor, index, definition):
+    if not _index_exists(cursor, index):
+        cursor.execute(f"ALTER TABLE jobs ADD {definition}")
+
+
+@migration(1, 'create jobs table')
+def create_jobs_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            title VARCHAR(255) NOT NULL,
+            company VARCHAR(255),
+            location VARCHAR(255),
+            salary VARCHAR(255),
+            job_type VARCHAR(100),
+            description TEXT,
+            posted_date VARCHAR(100),
+            job_url TEXT,
+            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_job (title, company, location)
+        )
+    ''')
+
+
+@migration(2, 'add normalized salary and posted date columns')
+def add_normalized_columns(cursor):
+    add_column(cursor, 'salary_min', 'DECIMAL(12, 2)')
+    add_column(cursor, 'salary_max', 'DECIMAL(12, 2)')
+    add_column(cursor, 'salary_period', 'VARCHAR(10)')
+    add_column(cursor, 'salary_annual', 'DECIMAL(12, 2)')
+    add_column(cursor, 'posted_at', 'DATETIME')
+    add_index(cursor, 'idx_salary_annual', 'INDEX idx_salary_annual (salary_annual)')
+    add_index(cursor, 'idx_posted_at', 'INDEX idx_posted_at (posted_at)')
+
+
+@migration(3, 'add indexes for listing and filtering queries')
+def add_query_indexes(cursor):
+    add_index(cursor, 'idx_scraped_at', 'INDEX idx_scraped_at (scraped_at)')
+    add_index(cursor, 'idx_company', 'INDEX idx_company (company)')
+    add_index(cursor, 'idx_job_type', 'INDEX idx_job_type (job_type)')
+
+
+@migration(4, 'add unique hash of job_url')
+def add_job_url_hash(cursor):
+    # TEXT can't be uniquely indexed directly, so index its SHA-256 instead.
+    # Missing URLs hash to NULL so they never collide with each other.
+    add_column(
+        cursor, 'job_url_hash',
+        "BINARY(32) AS (IF(job_url IS NULL OR job_url IN ('', 'N/A'), NULL, UNHEX(SHA2(job_url, 256)))) STORED"
+    )
+    if not _index_exists(cursor, 'unique_job_url'):
+        remove_url_duplicates(cursor)
+        cursor.execute("ALTER TABLE jobs ADD UNIQUE KEY unique_job_url (job_url_hash)")
+
+
+def remove_url_duplicates(cursor):
+    """Keep the earliest copy of any URL stored more than once.
+
+    The removed rows are copied to jobs_url_duplicates (with kept_id, the id
+    of the copy that stayed) before they are deleted.
+    """
+    cursor.execute('''
+        SELECT newer.id, MIN(older.id) FROM jobs newer
+        JOIN jobs older ON older.job_url_hash = newer.job_url_hash AND older.id < newer.id
+        GROUP BY newer.id
+    ''')
+    duplicates = cursor.fetchall()
+    if not duplicates:
+        return
+
+    copy = '''
+        SELECT newer.*, MIN(older.id) AS kept_id FROM jobs newer
+        JOIN jobs older ON older.job_url_hash = newer.job_url_hash AND older.id < newer.id
+        GROUP BY newer.id
+    '''
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS jobs_url_duplicates AS {copy} LIMIT 0")
+    cursor.execute(f"INSERT INTO jobs_url_duplicates {copy}")
+    cursor.execute('''
+        DELETE newer FROM jobs newer
+        JOIN jobs older ON older.job_url_hash = newer.job_url_hash AND older.id < newer.id
+    ''')
+    print(f"Removed {cursor.rowcount} jobs with a duplicate job_url (copied to jobs_url_duplicates): "
+          f"{', '.join(f'{job_id} (kept {kept_id})' for job_id, kept_id in duplicates)}")
+
+
+@migration(5, 'add MinHash signatures and LSH buckets for near-duplicate detection')
+def add_near_duplicate_index(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_minhash (
+            job_id INT PRIMARY KEY,
+            signature VARBINARY(512) NOT NULL,
+            FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_lsh_buckets (
+            band TINYINT UNSIGNED NOT NULL,
+            bucket BIGINT NOT NULL,
+            job_id INT NOT NULL,
+            PRIMARY KEY (band, bucket, job_id),
+            KEY idx_job_id (job_id),
+            FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE
+        )
+    ''')
+
+
+@migration(6, 'add crawl_state for incremental crawls')
+def add_crawl_state(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            query_key VARCHAR(255) PRIMARY KEY,
+            last_job_key VARCHAR(64),
+            last_new_jobs INT NOT NULL DEFAULT 0,
+            last_crawled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+@migration(7, 'link near-duplicate reposts to the original job')
+def add_duplicate_of(cursor):
+    add_column(cursor, 'duplicate_of', 'INT NULL')
+    add_index(
+        cursor, 'fk_duplicate_of',
+        'CONSTRAINT fk_duplicate_of FOREIGN KEY (duplicate_of) REFERENCES jobs(id) ON DELETE SET NULL'
+    )
+
+
+def current_version(cursor):
+    """Return the applied schema version, or 0 if migrations never ran."""
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+        return cursor.fetchone()[0] or 0
+    except Error as e:
+        if e.errno == 1146:  # table doesn't exist
+            return 0
+        raise
+
+
+def pending_migrations(cursor):
+    version = current_version(cursor)
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def schema_is_current(connection):
+    """True if every migration has been applied; costs a single SELECT."""
+    cursor = connection.cursor(buffered=True)
+    try:
+        return not pending_migrations(cursor)
+    finally:
+        cursor.close()
+
+
+def run_migrations(connection):
+    """Apply pending migrations in order; returns the versions applied.
+
+    When the schema is current this costs a single SELECT.
+    """
+    cursor = connection.cursor(buffered=True)
+    locked = False
+    try:
+        if not pending_migrations(cursor):
+            return []
+
+        # Serialize concurrent runners (e.g. two deploys running migrate.py at once).
+        cursor.execute("SELECT GET_LOCK('jobs_schema_migrations', 60)")
+        locked = cursor.fetchone()[0] == 1
+        if not locked:
+            raise RuntimeError('Timed out waiting for another migration run to finish')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        applied = []
+        for version, description, func in pending_migrations(cursor):
+            func(cursor)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            connection.commit()
+            applied.append(version)
+        return applied
+    finally:
+        if locked:
+            cursor.execute("SELECT RELEASE_LOCK('jobs_schema_migrations')")
+        cursor.close()
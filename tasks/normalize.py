@@ -0,0 +1,121 @@
+"""
+Normalization of scraped free-text fields.
+
+Salaries like "$50,000 - $70,000 a year" and dates like "Posted 3 days ago"
+are parsed into numeric / timestamp columns for a whole batch at once using
+pandas string methods, so the database can index and filter on them.
+"""
+import numpy as np
+import pandas as pd
+
+
+NORMALIZED_COLUMNS = ['salary_min', 'salary_max', 'salary_period', 'salary_annual', 'posted_at']
+# Always written as floats, even when a batch only holds whole-dollar amounts.
+FLOAT_COLUMNS = ['salary_min', 'salary_max', 'salary_annual']
+
+# Multipliers used to turn a pay rate into a yearly figure.
+PERIOD_TO_ANNUAL = {
+    'hour': 2080,
+    'day': 260,
+    'week': 52,
+    'month': 12,
+    'year': 1,
+}
+
+UNIT_SECONDS = {
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400,
+}
+
+AMOUNT_PATTERN = r'\$\s*([\d,]+(?:\.\d+)?)\s*([kK])?'
+RANGE_PATTERN = AMOUNT_PATTERN + r'(?:\s*[-–]\s*' + AMOUNT_PATTERN + r')?'
+PERIOD_PATTERN = r'(?:an?|per)\s+(hour|day|week|month|year)'
+AGE_PATTERN = r'(\d+)\+?\s*(minute|hour|day)s?\s+ago'
+
+
+def _to_amount(number, thousands):
+    """Convert extracted amount strings to floats, applying the 'K' suffix."""
+    values = pd.to_numeric(number.str.replace(',', '', regex=False), errors='coerce')
+    return values.where(thousands.isna(), values * 1000)
+
+
+def parse_salaries(salary):
+    """Parse a Series of salary strings into min, max, period and annual columns."""
+    text = salary.fillna('').astype(str)
+    lowered = text.str.lower()
+
+    amounts = text.str.extract(RANGE_PATTERN)
+    first = _to_amount(amounts[0], amounts[1])
+    second = _to_amount(amounts[2], amounts[3])
+
+    up_to = lowered.str.contains('up to', regex=False)
+    starting = lowered.str.contains(r'\b(?:from|starting at)\b', regex=True)
+
+    salary_min = first.where(~up_to)
+    salary_max = second.fillna(first).where(~starting)
+    salary_max = salary_max.where(~up_to, first)
+
+    period = lowered.str.extract(PERIOD_PATTERN)[0]
+    multiplier = period.map(PERIOD_TO_ANNUAL).astype(float)
+
+    midpoint = pd.concat([salary_min, salary_max], axis=1).mean(axis=1, skipna=True)
+    salary_annual = (midpoint * multiplier).round(2)
+
+    return pd.DataFrame({
+        'salary_min': salary_min,
+        'salary_max': salary_max,
+        'salary_period': period,
+        'salary_annual': salary_annual,
+    }, index=salary.index)
+
+
+def parse_posted_dates(posted_date, now=None):
+    """Turn relative dates such as "Posted 3 days ago" into absolute timestamps."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    lowered = posted_date.fillna('').astype(str).str.lower()
+
+    age = lowered.str.extract(AGE_PATTERN)
+    count = pd.to_numeric(age[0], errors='coerce')
+    seconds = count * age[1].map(UNIT_SECONDS).astype(float)
+
+    fresh = lowered.str.contains(r'just posted|today', regex=True)
+    seconds = seconds.where(~fresh, 0.0)
+
+    return now - pd.to_timedelta(seconds, unit='s')
+
+
+def normalize_jobs(jobs, now=None):
+    """Return a copy of the jobs DataFrame with the normalized columns added.
+
+    ``now`` is the moment relative dates are measured from; it defaults to the
+    current time but should be the scrape time when one is known.
+    """
+    jobs = jobs.copy()
+    salaries = parse_salaries(jobs['salary'] if 'salary' in jobs else pd.Series('', index=jobs.index))
+    for column in salaries.columns:
+        jobs[column] = salaries[column]
+
+    posted = jobs['posted_date'] if 'posted_date' in jobs else pd.Series('', index=jobs.index)
+    jobs['posted_at'] = parse_posted_dates(posted, now)
+    return jobs
+
+
+def to_db_rows(jobs, columns):
+    """Yield tuples for the given columns with NaN/NaT replaced by None."""
+    frame = jobs[columns].astype({column: float for column in FLOAT_COLUMNS if column in columns})
+    frame = frame.astype(object)
+    frame = frame.where(pd.notna(frame), None)
+    for row in frame.itertuples(index=False, name=None):
+        yield tuple(
+            value.to_pydatetime() if isinstance(value, pd.Timestamp)
+            else value.item() if isinstance(value, np.generic)
+            else value
+            for value in row
+        )
+
+
+def normalize_job(job, now=None):
+    """Normalize a single job dict; returns only the normalized fields."""
+    frame = normalize_jobs(pd.DataFrame([job]), now)
+    return dict(zip(NORMALIZED_COLUMNS, next(to_db_rows(frame, NORMALIZED_COLUMNS))))
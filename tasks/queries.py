@@ -0,0 +1,11 @@
+"""
+Read-side queries shared by the API and the CSV loader.
+"""
+
+# Columns of jobs exposed to readers (the API, get_all_jobs). Internal columns
+# such as job_url_hash are left out; add new public columns here as well.
+JOB_COLUMNS = [
+    'id', 'title', 'company', 'location', 'salary', 'job_type', 'description', 'posted_date', 'job_url',
+    'scraped_at', 'salary_min', 'salary_max', 'salary_period', 'salary_annual', 'posted_at', 'duplicate_of'
+]
+JOB_SELECT = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs"
@@ -0,0 +1,75 @@
+"""
+JSON serialization helpers for the jobs API.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Dates and decimals are rendered the same way Flask's jsonify
+renders them so clients see identical output on both paths.
+"""
+import gzip
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from email.utils import format_datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Responses smaller than this are sent uncompressed.
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def column_names(cursor):
+    """Column names of the last query, in result order."""
+    return [desc[0] for desc in cursor.description]
+
+
+def rows_to_dicts(rows, columns):
+    """Map each row tuple onto the precomputed column names."""
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _default(value):
+    if isinstance(value, date):
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    """Serialize payload to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(payload, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def compress(body, accept_encoding):
+    """Compress body for the client if it is large enough.
+
+    Returns the (possibly unchanged) body and the Content-Encoding to send,
+    or None when the body is left as is.
+    """
+    if len(body) < MIN_COMPRESS_SIZE or not accept_encoding:
+        return body, None
+
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+
+    if brotli is not None and 'br' in accepted:
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+    return body, None
@@ -1,23 +1,93 @@
 import requests
 from bs4 import BeautifulSoup
 import csv
-import time
+import gc
+import sys
+import threading
+import tracemalloc
+from typing import NamedTuple
 from urllib.parse import quote_plus
+from tasks.crawl_state import clear_pending_mark, load_crawl_state, write_pending_mark
+from tasks.job_keys import exact_key, job_key_from_url
+from tasks.throttle import parse_retry_after, shared_throttle
+
+# In incremental mode, stop paging once this share of a page is already known.
+SEEN_RATIO_STOP = 0.8
+DESCRIPTION_LIMIT = 500
+
+# Outcomes of fetching one results page.
+PAGE_OK = 'ok'
+PAGE_EMPTY = 'empty'
+PAGE_BLOCKED = 'blocked'
+PAGE_ERROR = 'error'
+
+BLOCK_STATUS_CODES = {403, 429, 503}
+# Text only found on challenge pages. Ordinary result pages may load a captcha
+# script (e.g. reCAPTCHA), so a bare 'captcha' is not enough to call it blocked.
+CAPTCHA_MARKERS = (
+    b'<title>just a moment...</title>',
+    b'<title>security check',
+    b'id="challenge-form"',
+    b'verify you are human',
+    b'additional verification required',
+)
+# Consecutive blocked attempts at the same page before giving up.
+MAX_BLOCK_RETRIES = 3
+
+
+class JobRecord(NamedTuple):
+    """One scraped job. A tuple keeps per-record overhead to the eight field slots."""
+    title: str = 'N/A'
+    company: str = 'N/A'
+    location: str = 'N/A'
+    salary: str = 'N/A'
+    job_type: str = 'N/A'
+    description: str = 'N/A'
+    posted_date: str = 'N/A'
+    job_url: str = 'N/A'
+
+
+def limited_text(elem, limit):
+    """Same as elem.get_text(strip=True)[:limit] without building the full text first."""
+    parts = []
+    size = 0
+    for text in elem.stripped_strings:
+        parts.append(text)
+        size += len(text)
+        if size >= limit:
+            break
+    return ''.join(parts)[:limit]
 
 
 class IndeedScraper:
-    def __init__(self, position, city, date_posted=""):
+    def __init__(self, position, city, date_posted="", known_keys=None, high_water=None, throttle=None):
         self.position = position
         self.city = city
         self.date_posted = date_posted
         self.base_url = "https://www.indeed.com/jobs"
         self.jobs = []
+        # Incremental mode: keys of jobs we already have, and the newest job key
+        # seen by the previous run of this query.
+        self.known_keys = known_keys
+        self.high_water = high_water
+        self.newest_job_key = None
+        self.reached_high_water = False
+        self.page_seen = 0
+        self.page_new = 0
+        self.known_skipped = 0
+        self.pages_fetched = 0
+        # Shared per process so the adaptive rate carries over between crawls.
+        self.throttle = throttle or shared_throttle
+        self.blocked = False
         
     def build_url(self, start=0):
         """Build the Indeed search URL with parameters."""
         url = f"{self.base_url}?q={quote_plus(self.position)}&l={quote_plus(self.city)}&start={start}"
         if self.date_posted:
             url += f"&fromage={self.date_posted}"
+        # Incremental stopping rules assume newest-first results.
+        if self.known_keys is not None:
+            url += "&sort=date"
         return url
     
     def scrape_page(self, url):
@@ -32,6 +102,13 @@ class IndeedScraper:
         
         try:
             response = requests.get(url, headers=headers, timeout=10)
+            
+            if response.status_code in BLOCK_STATUS_CODES:
+                print(f"Blocked with HTTP {response.status_code}, backing off")
+                self.throttle.record_block(url, f'http {response.status_code}',
+                                           parse_retry_after(response.headers.get('Retry-After')))
+                return PAGE_BLOCKED
+            
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -55,38 +132,73 @@ class IndeedScraper:
             if not job_cards:
                 job_cards = soup.find_all('a', class_='tapItem')
             
+            # A captcha page has no job cards but must not be mistaken for the end of results.
+            if not job_cards and self.is_captcha(response.content):
+                print("Captcha page detected, backing off")
+                self.throttle.record_block(url, 'captcha')
+                return PAGE_BLOCKED
+            
+            self.throttle.record_success(url)
             print(f"Found {len(job_cards)} job cards using soup")
+            self.pages_fetched += 1
+            self.page_seen = 0
+            self.page_new = 0
             
             for card in job_cards:
                 try:
                     job_data = self.extract_job_data(card, soup)
-                    if job_data and job_data['title'] != 'N/A':
+                    if job_data and job_data.title != 'N/A':
+                        if self.is_known(card, job_data):
+                            continue
                         self.jobs.append(job_data)
-                        print(f"Extracted: {job_data['title']} at {job_data['company']}")
+                        self.page_new += 1
+                        print(f"Extracted: {job_data.title} at {job_data.company}")
                 except Exception as e:
                     print(f"Error extracting job: {e}")
                     continue
             
-            return len(job_cards) > 0
+            return PAGE_OK if job_cards else PAGE_EMPTY
             
         except requests.exceptions.RequestException as e:
             print(f"Request error: {e}")
-            return False
+            return PAGE_ERROR
         except Exception as e:
             print(f"Scraping error: {e}")
+            return PAGE_ERROR
+    
+    def is_captcha(self, content):
+        lowered = content.lower()
+        return any(marker in lowered for marker in CAPTCHA_MARKERS)
+    
+    def extract_job_key(self, card, job_data):
+        """Indeed's data-jk id for a card, falling back to the one in its URL."""
+        job_key = card.get('data-jk')
+        if not job_key:
+            elem = card.find(attrs={'data-jk': True})
+            job_key = elem.get('data-jk') if elem else None
+        return job_key or job_key_from_url(job_data.job_url)
+    
+    def is_known(self, card, job_data):
+        """Track incremental-crawl state for a card; True if we already have the job."""
+        if self.known_keys is None:
             return False
+        
+        job_key = self.extract_job_key(card, job_data)
+        if job_key and self.newest_job_key is None:
+            self.newest_job_key = job_key
+        if job_key and job_key == self.high_water:
+            self.reached_high_water = True
+        
+        if (job_key and job_key in self.known_keys) or \
+                exact_key(job_data.title, job_data.company, job_data.location) in self.known_keys:
+            self.page_seen += 1
+            self.known_skipped += 1
+            return True
+        return False
     
     def extract_job_data(self, card, soup):
-        job_data = {
-            'title': 'N/A',
-            'company': 'N/A',
-            'location': 'N/A',
-            'salary': 'N/A',
-            'job_type': 'N/A',
-            'description': 'N/A',
-            'posted_date': 'N/A',
-            'job_url': 'N/A'
-        }
+        # Only fields that were found are set; JobRecord supplies 'N/A' for the rest.
+        job_data = {}
         
         try:
             title_elem = card.find('h2', class_='jobTitle')
@@ -114,7 +226,8 @@ class IndeedScraper:
             if not company_elem:
                 company_elem = card.find('span', class_='css-63koeb')
             if company_elem:
-                job_data['company'] = company_elem.get_text(strip=True)
+                # Companies, locations and job types repeat across a crawl, so share one copy.
+                job_data['company'] = sys.intern(company_elem.get_text(strip=True))
             
             location_elem = card.find('div', class_='companyLocation')
             if not location_elem:
@@ -122,7 +235,7 @@ class IndeedScraper:
             if not location_elem:
                 location_elem = card.find('div', class_='css-1p0sjhy')
             if location_elem:
-                job_data['location'] = location_elem.get_text(strip=True)
+                job_data['location'] = sys.intern(location_elem.get_text(strip=True))
             
             salary_elem = card.find('div', class_='salary-snippet')
             if not salary_elem:
@@ -148,7 +261,7 @@ class IndeedScraper:
             if not desc_elem:
                 desc_elem = card.find('div', class_='css-9446fg')
             if desc_elem:
-                job_data['description'] = desc_elem.get_text(strip=True)[:500]  # Limit length
+                job_data['description'] = limited_text(desc_elem, DESCRIPTION_LIMIT)
             
             job_type_elem = card.find('div', class_='metadata')
             if job_type_elem:
@@ -162,26 +275,54 @@ class IndeedScraper:
                 elif 'remote' in text.lower():
                     job_data['job_type'] = 'Remote'
             
-            return job_data
+            return JobRecord(**job_data)
             
         except Exception as e:
             return None
     
     def scrape_all_pages(self, max_pages=5):
         """Scrape multiple pages of job listings."""
-        for page in range(max_pages):
+        page = 0
+        block_retries = 0
+        
+        while page < max_pages:
             start = page * 10
             url = self.build_url(start)
             
-            has_results = self.scrape_page(url)
+            # Paces requests to the current adaptive rate for the domain; gives up
+            # rather than holding the thread through a very long back-off.
+            if not self.throttle.wait(url):
+                print("Next request slot is too far away, giving up")
+                self.blocked = True
+                break
+            outcome = self.scrape_page(url)
+            
+            if outcome == PAGE_BLOCKED:
+                block_retries += 1
+                if block_retries >= MAX_BLOCK_RETRIES:
+                    self.blocked = True
+                    break
+                continue
+            
+            block_retries = 0
+            
+            if outcome != PAGE_OK:
+                break
             
-            if not has_results:
+            if self.known_keys is not None and self.should_stop_paging():
                 break
             
-            time.sleep(2)
+            page += 1
         
         return self.jobs
     
+    def should_stop_paging(self):
+        """Results are newest first, so a mostly-known page means the rest are known too."""
+        if self.reached_high_water:
+            return True
+        page_size = self.page_seen + self.page_new
+        return page_size > 0 and self.page_seen / page_size >= SEEN_RATIO_STOP
+    
     def save_to_csv(self, filename='indeed_jobs.csv'):
         """Save scraped jobs to CSV file."""
         if not self.jobs:
@@ -190,9 +331,8 @@ class IndeedScraper:
         
         try:
             with open(filename, 'w', newline='', encoding='utf-8') as file:
-                fieldnames = ['title', 'company', 'location', 'salary', 'job_type', 'description', 'posted_date', 'job_url']
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
-                writer.writeheader()
+                writer = csv.writer(file)
+                writer.writerow(JobRecord._fields)
                 writer.writerows(self.jobs)
             print(f"Saved {len(self.jobs)} jobs to {filename}")
             return True
@@ -201,9 +341,81 @@ class IndeedScraper:
             return False
 
 
-def run_scraper(position, city, date_posted="", max_pages=5):
-    """Main function to run scraper programmatically."""
-    scraper = IndeedScraper(position, city, date_posted)
-    jobs = scraper.scrape_all_pages(max_pages)
-    success = scraper.save_to_csv('indeed_jobs.csv')
-    return {'success': success, 'count': len(jobs), 'jobs': jobs}
+# Only one crawl per process may run tracemalloc at a time.
+_trace_lock = threading.Lock()
+
+
+def memory_report(jobs, snapshot, top=5):
+    """Summarize traced allocations still held after a crawl."""
+    current, peak = tracemalloc.get_traced_memory()
+    stats = snapshot.statistics('lineno')
+    return {
+        'current_kb': round(current / 1024, 1),
+        'peak_kb': round(peak / 1024, 1),
+        'bytes_per_job': round(current / len(jobs)) if jobs else 0,
+        'top_allocations': [
+            {'location': str(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+            for stat in stats[:top]
+        ]
+    }
+
+
+def run_scraper(position, city, date_posted="", max_pages=5, incremental=False, trace_memory=False):
+    """Main function to run scraper programmatically.
+    
+    With incremental=True, jobs already in the database are skipped and paging
+    stops at the first mostly-known page or at the previous run's newest job.
+    The new high-water mark is saved when the CSV is loaded into the database.
+    With trace_memory=True the crawl runs under tracemalloc and the result
+    includes a memory report (tracing slows the crawl, so it is opt-in).
+    tracemalloc is process-wide, so the numbers only mean something when this
+    is the only crawl running; if tracing is already on, no report is made.
+    """
+    known_keys, high_water = None, None
+    if incremental:
+        known_keys, high_water = load_crawl_state(position, city, date_posted)
+    
+    tracing = trace_memory and _trace_lock.acquire(blocking=False)
+    if tracing and tracemalloc.is_tracing():
+        _trace_lock.release()
+        tracing = False
+    
+    scraper = IndeedScraper(position, city, date_posted, known_keys, high_water)
+    memory = None
+    if tracing:
+        try:
+            tracemalloc.start()
+            jobs = scraper.scrape_all_pages(max_pages)
+            gc.collect()  # drop parse trees still waiting on the cycle collector
+            memory = memory_report(jobs, tracemalloc.take_snapshot())
+        finally:
+            tracemalloc.stop()
+            _trace_lock.release()
+    else:
+        jobs = scraper.scrape_all_pages(max_pages)
+        if trace_memory:
+            memory = {'error': 'Memory tracing is already active in this process; no report for this crawl'}
+    
+    csv_file = 'indeed_jobs.csv'
+    success = scraper.save_to_csv(csv_file)
+    
+    if success:
+        # The old CSV (and any mark waiting on it) has just been replaced.
+        clear_pending_mark(csv_file)
+        # A blocked crawl may have missed pages, so its mark isn't trusted.
+        if incremental and not scraper.blocked:
+            write_pending_mark(csv_file, position, city, date_posted,
+                               scraper.newest_job_key or high_water, len(jobs))
+    
+    result = {
+        'success': success,
+        'count': len(jobs),
+        'jobs': [job._asdict() for job in jobs],
+        'pages_fetched': scraper.pages_fetched,
+        'known_skipped': scraper.known_skipped,
+        'blocked': scraper.blocked,
+        'throttle': scraper.throttle.stats()
+    }
+    if memory is not None:
+        result['memory'] = memory
+    return result
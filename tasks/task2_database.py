@@ -1,21 +1,34 @@
 import mysql.connector
 from mysql.connector import Error
-import csv
+import io
 import os
-from dotenv import load_dotenv
+from datetime import datetime
+import pandas as pd
+from config import Config
+from tasks.crawl_state import read_pending_mark, save_pending_mark
+from tasks.dedupe import band_keys, exact_key, load_index, save_signatures, signature
+from tasks.migrations import schema_is_current
+from tasks.normalize import normalize_jobs, to_db_rows
+from tasks.queries import JOB_SELECT
 
-load_dotenv()
+CSV_COLUMNS = ['title', 'company', 'location', 'salary', 'job_type', 'description', 'posted_date', 'job_url']
+ROW_COLUMNS = CSV_COLUMNS + ['salary_min', 'salary_max', 'salary_period', 'salary_annual', 'posted_at']
+INSERT_COLUMNS = ROW_COLUMNS + ['duplicate_of']
+INSERT_QUERY = f"""
+    INSERT INTO jobs ({', '.join(INSERT_COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})
+"""
 
 
 class JobDatabase:
     def __init__(self):
         self.connection = None
         self.cursor = None
-        self.host = os.getenv('DB_HOST', 'localhost')
-        self.port = int(os.getenv('DB_PORT', 3306))
-        self.user = os.getenv('DB_USER', 'root')
-        self.password = os.getenv('DB_PASSWORD', '')
-        self.database = os.getenv('DB_NAME', 'jobs_db')
+        self.host = Config.DB_HOST
+        self.port = Config.DB_PORT
+        self.user = Config.DB_USER
+        self.password = Config.DB_PASSWORD
+        self.database = Config.DB_NAME
         
     def connect(self):
         """Connect to MySQL database."""
@@ -24,89 +37,95 @@ class JobDatabase:
                 host=self.host,
                 port=self.port,
                 user=self.user,
-                password=self.password
+                password=self.password,
+                database=self.database
             )
             self.cursor = self.connection.cursor()
-            
-            self.cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
-            self.cursor.execute(f"USE {self.database}")
-            
             return True
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
             return False
     
-    def create_table(self):
-        """Create jobs table if it doesn't exist."""
+    def check_schema(self):
+        """Check that migrate.py has applied every migration (a single SELECT)."""
         try:
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    title VARCHAR(255) NOT NULL,
-                    company VARCHAR(255),
-                    location VARCHAR(255),
-                    salary VARCHAR(255),
-                    job_type VARCHAR(100),
-                    description TEXT,
-                    posted_date VARCHAR(100),
-                    job_url TEXT,
-                    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE KEY unique_job (title, company, location)
-                )
-            ''')
-            self.connection.commit()
-            return True
+            return schema_is_current(self.connection)
         except Error as e:
-            print(f"Error creating table: {e}")
+            print(f"Error checking schema version: {e}")
             return False
     
     def load_from_csv(self, csv_file='indeed_jobs.csv'):
         if not os.path.exists(csv_file):
-            return {'success': False, 'error': 'CSV file not found', 'inserted': 0, 'duplicates': 0}
+            return {'success': False, 'error': 'CSV file not found', 'inserted': 0, 'duplicates': 0, 'near_duplicates': 0}
         
         try:
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                csv_reader = csv.DictReader(file)
+            # Read the CSV once and take the crawl mark written for these exact bytes;
+            # a crawl finishing mid-load replaces both files.
+            with open(csv_file, 'rb') as file:
+                csv_data = file.read()
+            mark = read_pending_mark(csv_file, csv_data)
+            jobs = pd.read_csv(io.BytesIO(csv_data), dtype=str, keep_default_na=False, encoding='utf-8')
+            jobs = jobs.reindex(columns=CSV_COLUMNS, fill_value='N/A')
+            
+            # Relative dates ("3 days ago") are relative to when the CSV was written.
+            scraped_at = datetime.fromtimestamp(os.path.getmtime(csv_file))
+            jobs = normalize_jobs(jobs, now=scraped_at)
+            
+            signatures = [signature(title, description) for title, description in zip(jobs['title'], jobs['description'])]
+            keys = [band_keys(sig) for sig in signatures]
+            near_index = load_index(self.cursor, keys)
+            
+            inserted_count = 0
+            duplicate_count = 0
+            near_duplicate_count = 0
+            new_signatures = []
+            
+            for row, sig, sig_keys in zip(to_db_rows(jobs, ROW_COLUMNS), signatures, keys):
+                title, company, location, description = row[0], row[1], row[2], row[5]
                 
-                inserted_count = 0
-                duplicate_count = 0
+                match = near_index.find(title, company, location, description, sig, sig_keys)
+                if match is not None and near_index.entries[match].exact_key == exact_key(title, company, location):
+                    duplicate_count += 1
+                    continue
                 
-                for row in csv_reader:
-                    try:
-                        self.cursor.execute('''
-                            INSERT INTO jobs (title, company, location, salary, job_type, description, posted_date, job_url)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ''', (
-                            row.get('title', 'N/A'),
-                            row.get('company', 'N/A'),
-                            row.get('location', 'N/A'),
-                            row.get('salary', 'N/A'),
-                            row.get('job_type', 'N/A'),
-                            row.get('description', 'N/A'),
-                            row.get('posted_date', 'N/A'),
-                            row.get('job_url', 'N/A')
-                        ))
-                        inserted_count += 1
-                    except Error as e:
-                        if e.errno == 1062:  
-                            duplicate_count += 1
-                        continue
+                # Reposts are stored linked to the job they repeat (duplicate_of).
+                try:
+                    self.cursor.execute(INSERT_QUERY, row + (match,))
+                except Error as e:
+                    if e.errno == 1062:  
+                        duplicate_count += 1
+                    continue
                 
-                self.connection.commit()
+                if match is not None:
+                    near_duplicate_count += 1
+                    continue
                 
-                return {
-                    'success': True,
-                    'inserted': inserted_count,
-                    'duplicates': duplicate_count
-                }
+                inserted_count += 1
+                job_id = self.cursor.lastrowid
+                near_index.add(job_id, title, company, location, description, sig, sig_keys)
+                new_signatures.append((job_id, sig, sig_keys))
+            
+            save_signatures(self.cursor, new_signatures)
+            self.connection.commit()
+            
+            # The crawl that produced these rows can now advance its high-water mark.
+            if mark is not None:
+                save_pending_mark(self.connection, csv_file, mark)
+            
+            return {
+                'success': True,
+                'inserted': inserted_count,
+                'duplicates': duplicate_count,
+                'near_duplicates': near_duplicate_count
+            }
                 
         except Exception as e:
             self.connection.rollback()
-            return {'success': False, 'error': str(e), 'inserted': 0, 'duplicates': 0}
+            return {'success': False, 'error': str(e), 'inserted': 0, 'duplicates': 0, 'near_duplicates': 0}
     
     def get_all_jobs(self):
         try:
-            self.cursor.execute('SELECT * FROM jobs')
+            self.cursor.execute(JOB_SELECT)
             jobs = self.cursor.fetchall()
             return jobs
         except Error as e:
@@ -134,10 +153,10 @@ def load_to_database(csv_file='indeed_jobs.csv'):
     
     try:
         if not db.connect():
-            return {'success': False, 'error': 'Database connection failed. Check your .env file and MySQL server.'}
+            return {'success': False, 'error': 'Database connection failed. Check your .env file and MySQL server, and run python migrate.py.'}
         
-        if not db.create_table():
-            return {'success': False, 'error': 'Failed to create table'}
+        if not db.check_schema():
+            return {'success': False, 'error': 'Database schema is out of date. Run python migrate.py.'}
         
         result = db.load_from_csv(csv_file)
         total_jobs = db.get_job_count()
@@ -1,48 +1,42 @@
-from flask import Blueprint, jsonify, request
-import mysql.connector
+from flask import Blueprint, Response, jsonify, request
 from mysql.connector import Error
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import math
+from datetime import datetime
+from tasks.db import get_connection, release
+from tasks.queries import JOB_SELECT
+from tasks.serialization import column_names, compress, dumps, rows_to_dicts
 
 api_bp = Blueprint('api', __name__)
 
 
 def get_db_connection():
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASSWORD', ''),
-            database=os.getenv('DB_NAME', 'jobs_db')
-        )
-        return connection
+        return get_connection()
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
         return None
 
 
 def dict_from_row(row, columns):
-    """Convert MySQL row to dictionary."""
-    return {
-        'id': row[0],
-        'title': row[1],
-        'company': row[2],
-        'location': row[3],
-        'salary': row[4],
-        'job_type': row[5],
-        'description': row[6],
-        'posted_date': row[7],
-        'job_url': row[8],
-        'scraped_at': row[9]
-    }
+    """Convert MySQL row to dictionary using the query's column names."""
+    return dict(zip(columns, row))
+
+
+def json_response(payload, status=200):
+    """Serialize payload with the fast encoder and compress it if the client allows."""
+    body, encoding = compress(dumps(payload), request.headers.get('Accept-Encoding', ''))
+    response = Response(body, status=status, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
 
 
 @api_bp.route('/api/jobs', methods=['GET'])
 def get_jobs():
     """GET /api/jobs - Return all job listings with optional filters."""
+    conn = None
+    cursor = None
     try:
         conn = get_db_connection()
         if not conn:
@@ -55,10 +49,29 @@ def get_jobs():
         
         city = request.args.get('city', '').strip()
         position = request.args.get('position', '').strip()
+        min_salary = request.args.get('min_salary', '').strip()
+        posted_since = request.args.get('posted_since', '').strip()
+        compact = request.args.get('format', '').strip() == 'compact'
+        include_duplicates = request.args.get('include_duplicates', '').strip() in ('1', 'true')
+        
+        try:
+            min_salary = float(min_salary) if min_salary else None
+            if min_salary is not None and not math.isfinite(min_salary):
+                raise ValueError(min_salary)
+            posted_since = datetime.fromisoformat(posted_since) if posted_since else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'min_salary must be a number and posted_since an ISO date'
+            }), 400
         
-        query = 'SELECT * FROM jobs WHERE 1=1'
+        query = JOB_SELECT + ' WHERE 1=1'
         params = []
         
+        # Reposts linked to an earlier job are hidden unless asked for.
+        if not include_duplicates:
+            query += ' AND duplicate_of IS NULL'
+        
         if city:
             query += ' AND location LIKE %s'
             params.append(f'%{city}%')
@@ -67,31 +80,47 @@ def get_jobs():
             query += ' AND title LIKE %s'
             params.append(f'%{position}%')
         
+        if min_salary is not None:
+            query += ' AND salary_annual >= %s'
+            params.append(min_salary)
+        
+        if posted_since is not None:
+            query += ' AND posted_at >= %s'
+            params.append(posted_since)
+        
         cursor.execute(query, params)
         jobs = cursor.fetchall()
+        columns = column_names(cursor)
         
-        columns = [desc[0] for desc in cursor.description]
-        jobs_list = [dict_from_row(job, columns) for job in jobs]
-        
-        cursor.close()
-        conn.close()
+        # ?format=compact sends the column names once and each job as an array.
+        if compact:
+            return json_response({
+                'success': True,
+                'count': len(jobs),
+                'columns': columns,
+                'jobs': jobs
+            })
         
-        return jsonify({
+        return json_response({
             'success': True,
-            'count': len(jobs_list),
-            'jobs': jobs_list
-        }), 200
+            'count': len(jobs),
+            'jobs': rows_to_dicts(jobs, columns)
+        })
         
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+    finally:
+        release(conn, cursor)
 
 
 @api_bp.route('/api/jobs/<int:job_id>', methods=['GET'])
 def get_job(job_id):
     """GET /api/jobs/<id> - Return details for a specific job."""
+    conn = None
+    cursor = None
     try:
         conn = get_db_connection()
         if not conn:
@@ -102,18 +131,15 @@ def get_job(job_id):
             
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM jobs WHERE id = %s', (job_id,))
+        cursor.execute(JOB_SELECT + ' WHERE id = %s', (job_id,))
         job = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        columns = column_names(cursor)
         
         if job:
-            columns = ['id', 'title', 'company', 'location', 'salary', 'job_type', 'description', 'posted_date', 'job_url', 'scraped_at']
-            return jsonify({
+            return json_response({
                 'success': True,
                 'job': dict_from_row(job, columns)
-            }), 200
+            })
         else:
             return jsonify({
                 'success': False,
@@ -125,11 +151,15 @@ def get_job(job_id):
             'success': False,
             'error': str(e)
         }), 500
+    finally:
+        release(conn, cursor)
 
 
 @api_bp.route('/api/jobs', methods=['POST'])
 def add_job():
     """POST /api/jobs - Add a new job entry."""
+    conn = None
+    cursor = None
     try:
         data = request.get_json()
         
@@ -147,6 +177,10 @@ def add_job():
         description = data.get('description', 'N/A')
         posted_date = data.get('posted_date', 'N/A')
         job_url = data.get('job_url', 'N/A')
+        # Imported here so API-only workers don't load pandas until a write needs it.
+        from tasks.dedupe import find_near_duplicate, save_signatures
+        from tasks.normalize import normalize_job
+        normalized = normalize_job({'salary': salary, 'posted_date': posted_date})
         
         conn = get_db_connection()
         if not conn:
@@ -157,21 +191,27 @@ def add_job():
             
         cursor = conn.cursor()
         
-        cursor.execute('''
-            INSERT INTO jobs (title, company, location, salary, job_type, description, posted_date, job_url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ''', (title, company, location, salary, job_type, description, posted_date, job_url))
+        # A repost of a stored job is linked to it, the same way ingest does.
+        duplicate_of, sig, keys = find_near_duplicate(cursor, title, company, location, description)
         
-        conn.commit()
+        cursor.execute('''
+            INSERT INTO jobs (title, company, location, salary, job_type, description, posted_date, job_url,
+                              salary_min, salary_max, salary_period, salary_annual, posted_at, duplicate_of)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ''', (title, company, location, salary, job_type, description, posted_date, job_url,
+              normalized['salary_min'], normalized['salary_max'], normalized['salary_period'],
+              normalized['salary_annual'], normalized['posted_at'], duplicate_of))
         job_id = cursor.lastrowid
         
-        cursor.close()
-        conn.close()
+        if duplicate_of is None:
+            save_signatures(cursor, [(job_id, sig, keys)])
+        conn.commit()
         
         return jsonify({
             'success': True,
             'message': 'Job added successfully',
-            'job_id': job_id
+            'job_id': job_id,
+            'duplicate_of': duplicate_of
         }), 201
         
     except Error as e:
@@ -189,11 +229,15 @@ def add_job():
             'success': False,
             'error': str(e)
         }), 500
+    finally:
+        release(conn, cursor)
 
 
 @api_bp.route('/api/jobs/<int:job_id>', methods=['PUT'])
 def update_job(job_id):
     """PUT /api/jobs/<id> - Update existing job details."""
+    conn = None
+    cursor = None
     try:
         data = request.get_json()
         
@@ -212,12 +256,10 @@ def update_job(job_id):
             
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM jobs WHERE id = %s', (job_id,))
+        cursor.execute('SELECT id FROM jobs WHERE id = %s', (job_id,))
         job = cursor.fetchone()
         
         if not job:
-            cursor.close()
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Job not found'
@@ -233,9 +275,18 @@ def update_job(job_id):
                 update_fields.append(f'{field} = %s')
                 params.append(data[field])
         
+        # Keep the parsed columns in step with the free-text ones they come from.
+        from tasks.normalize import normalize_job
+        normalized = normalize_job({'salary': data.get('salary', ''), 'posted_date': data.get('posted_date', '')})
+        if 'salary' in data:
+            for field in ['salary_min', 'salary_max', 'salary_period', 'salary_annual']:
+                update_fields.append(f'{field} = %s')
+                params.append(normalized[field])
+        if 'posted_date' in data:
+            update_fields.append('posted_at = %s')
+            params.append(normalized['posted_at'])
+        
         if not update_fields:
-            cursor.close()
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'No valid fields to update'
@@ -245,10 +296,12 @@ def update_job(job_id):
         
         query = f"UPDATE jobs SET {', '.join(update_fields)} WHERE id = %s"
         cursor.execute(query, params)
-        conn.commit()
         
-        cursor.close()
-        conn.close()
+        # The stored signature covers the title and description.
+        if 'title' in data or 'description' in data:
+            from tasks.dedupe import reindex_job
+            reindex_job(cursor, job_id)
+        conn.commit()
         
         return jsonify({
             'success': True,
@@ -260,11 +313,15 @@ def update_job(job_id):
             'success': False,
             'error': str(e)
         }), 500
+    finally:
+        release(conn, cursor)
 
 
 @api_bp.route('/api/jobs/<int:job_id>', methods=['DELETE'])
 def delete_job(job_id):
     """DELETE /api/jobs/<id> - Delete a job entry."""
+    conn = None
+    cursor = None
     try:
         conn = get_db_connection()
         if not conn:
@@ -275,12 +332,10 @@ def delete_job(job_id):
             
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM jobs WHERE id = %s', (job_id,))
+        cursor.execute('SELECT id FROM jobs WHERE id = %s', (job_id,))
         job = cursor.fetchone()
         
         if not job:
-            cursor.close()
-            conn.close()
             return jsonify({
                 'success': False,
                 'error': 'Job not found'
@@ -289,9 +344,6 @@ def delete_job(job_id):
         cursor.execute('DELETE FROM jobs WHERE id = %s', (job_id,))
         conn.commit()
         
-        cursor.close()
-        conn.close()
-        
         return jsonify({
             'success': True,
             'message': 'Job deleted successfully'
@@ -302,3 +354,5 @@ def delete_job(job_id):
             'success': False,
             'error': str(e)
         }), 500
+    finally:
+        release(conn, cursor)
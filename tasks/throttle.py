@@ -0,0 +1,124 @@
+"""
+Adaptive per-domain request throttle.
+
+Uses AIMD (additive increase, multiplicative decrease): each healthy
+response raises a domain's request rate by a small fixed step, and each
+block signal (429/403/503 or a captcha page) cuts it sharply and honours
+any Retry-After header. One throttle is shared by every crawl in the
+process (shared_throttle), so a backed-off rate carries over to the next run.
+"""
+import threading
+import time
+from urllib.parse import urlparse
+
+# Requests per second.
+INITIAL_RATE = 0.5
+MIN_RATE = 1 / 60
+MAX_RATE = 2.0
+RATE_INCREASE = 0.05
+RATE_DECREASE = 0.5
+# Block events kept per domain for the scraper result.
+MAX_BLOCK_EVENTS = 50
+# Longest we'll sleep for a request slot (e.g. after a long Retry-After);
+# beyond this the crawl gives up instead of holding the request thread.
+MAX_WAIT = 300
+
+
+class DomainState:
+    __slots__ = ('rate', 'next_request_at', 'healthy', 'blocks', 'block_events')
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.next_request_at = 0.0
+        self.healthy = 0
+        self.blocks = 0
+        self.block_events = []
+
+
+class AdaptiveThrottle:
+    def __init__(self, initial_rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 increase=RATE_INCREASE, decrease=RATE_DECREASE, clock=time.monotonic, sleep=time.sleep):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.sleep = sleep
+        self.domains = {}
+        self.lock = threading.Lock()
+
+    def _state(self, url):
+        domain = urlparse(url).netloc
+        if domain not in self.domains:
+            self.domains[domain] = DomainState(self.initial_rate)
+        return self.domains[domain]
+
+    def wait(self, url):
+        """Reserve the domain's next request slot and sleep until it.
+
+        Returns False without sleeping if the slot is more than MAX_WAIT away.
+        """
+        with self.lock:
+            state = self._state(url)
+            now = self.clock()
+            start = max(now, state.next_request_at)
+            if start - now > MAX_WAIT:
+                return False
+            state.next_request_at = start + 1 / state.rate
+        if start > now:
+            self.sleep(start - now)
+        return True
+
+    def record_success(self, url):
+        with self.lock:
+            state = self._state(url)
+            state.healthy += 1
+            state.rate = min(self.max_rate, state.rate + self.increase)
+
+    def record_block(self, url, reason, retry_after=None):
+        with self.lock:
+            state = self._state(url)
+            state.blocks += 1
+            state.rate = max(self.min_rate, state.rate * self.decrease)
+
+            delay = 1 / state.rate
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            state.next_request_at = self.clock() + delay
+
+            state.block_events.append({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'url': url,
+                'reason': reason,
+                'rate': round(state.rate, 4),
+                'retry_after': retry_after
+            })
+            del state.block_events[:-MAX_BLOCK_EVENTS]
+
+    def stats(self):
+        with self.lock:
+            return self._stats()
+
+    def _stats(self):
+        return {
+            domain: {
+                'rate': round(state.rate, 4),
+                'delay': round(1 / state.rate, 2),
+                'healthy_responses': state.healthy,
+                'blocks': state.blocks,
+                'block_events': list(state.block_events)
+            }
+            for domain, state in self.domains.items()
+        }
+
+
+shared_throttle = AdaptiveThrottle()
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header; HTTP-date values are ignored."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
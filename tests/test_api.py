@@ -0,0 +1,136 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import tasks.task3_api as api
+from app import app
+from tasks.queries import JOB_COLUMNS
+
+ROW = (
+    1, 'Python Developer', 'Acme', 'Remote', '$50,000 - $70,000 a year', 'Full-time', 'Build things',
+    'Posted 3 days ago', 'https://www.indeed.com/viewjob?jk=abc', datetime(2024, 1, 5, 12, 0),
+    Decimal('50000.00'), Decimal('70000.00'), 'year', Decimal('60000.00'), datetime(2024, 1, 2, 12, 0), None,
+)
+
+
+class FakeCursor:
+    """Answers queries the way MySQL would once every migration has run."""
+
+    def __init__(self, log):
+        self.log = log
+        self.description = None
+        self.rows = []
+        self.lastrowid = None
+
+    def execute(self, query, params=()):
+        self.log.append(query)
+        if 'FROM job_lsh_buckets' in query and query.lstrip().startswith('SELECT'):
+            # No stored job shares a bucket with the one being written.
+            self.description, self.rows = [('job_id',)], []
+            return
+        if 'INSERT INTO jobs' in query:
+            self.lastrowid = 2
+            return
+        if 'SELECT title, description, duplicate_of' in query:
+            self.description, self.rows = None, [(ROW[1], ROW[6], ROW[15])]
+            return
+        if 'SELECT *' in query:
+            # SELECT * also returns the internal BINARY job_url_hash column.
+            columns, row = JOB_COLUMNS + ['job_url_hash'], ROW + (bytearray(32),)
+        else:
+            columns, row = JOB_COLUMNS, ROW
+        self.description = [(name,) for name in columns]
+        self.rows = [row]
+
+    def executemany(self, query, params):
+        self.log.append(query)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+        self.released = False
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        pass
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        self.released = True
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    connection = FakeConnection()
+    monkeypatch.setattr(api, 'get_connection', lambda: connection)
+    return connection
+
+
+def test_job_columns_exclude_internal_hash():
+    assert 'job_url_hash' not in JOB_COLUMNS
+
+
+@pytest.mark.parametrize('url', ['/api/jobs', '/api/jobs?format=compact', '/api/jobs/1'])
+def test_reading_jobs_after_migrating(conn, url):
+    response = app.test_client().get(url)
+
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert not any('SELECT *' in query for query in conn.log)
+    assert conn.released
+
+    data = response.get_json()
+    assert data['success']
+    if 'compact' in url:
+        assert data['columns'] == JOB_COLUMNS
+    else:
+        job = data['jobs'][0] if 'jobs' in data else data['job']
+        assert job['salary_annual'] == '60000.00'
+        assert 'job_url_hash' not in job
+
+
+@pytest.mark.parametrize('value', ['nan', 'inf', '-Infinity', 'abc'])
+def test_min_salary_must_be_a_finite_number(conn, value):
+    response = app.test_client().get(f'/api/jobs?min_salary={value}')
+
+    assert response.status_code == 400
+    assert conn.log == []
+    assert conn.released
+
+
+def test_added_job_is_indexed(conn):
+    response = app.test_client().post('/api/jobs', json={
+        'title': 'Python Developer', 'company': 'Acme', 'location': 'Remote', 'description': 'Build things'
+    })
+
+    assert response.status_code == 201, response.get_data(as_text=True)
+    assert response.get_json()['duplicate_of'] is None
+    assert any('INSERT INTO job_minhash' in query for query in conn.log)
+    assert conn.released
+
+
+@pytest.mark.parametrize('data, reindexed', [
+    ({'title': 'Senior Python Developer'}, True),
+    ({'description': 'Build other things'}, True),
+    ({'salary': '$50 an hour'}, False),
+])
+def test_updated_job_is_reindexed(conn, data, reindexed):
+    response = app.test_client().put('/api/jobs/1', json=data)
+
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert any('DELETE FROM job_minhash' in query for query in conn.log) is reindexed
+    assert any('INSERT INTO job_minhash' in query for query in conn.log) is reindexed
@@ -0,0 +1,47 @@
+import tasks.crawl_state as crawl_state
+from tasks.crawl_state import pending_mark_path, read_pending_mark, save_pending_mark, write_pending_mark
+
+
+def write_csv(path, rows):
+    path.write_text('title,company\n' + ''.join(f'{row},Acme\n' for row in rows), encoding='utf-8')
+    return path.read_bytes()
+
+
+def test_mark_belongs_to_the_csv_it_was_written_for(tmp_path):
+    csv_file = tmp_path / 'jobs.csv'
+    data = write_csv(csv_file, ['Python Developer'])
+    write_pending_mark(str(csv_file), 'Python', 'Austin', '', 'abc', 1)
+
+    mark = read_pending_mark(str(csv_file), data)
+
+    assert mark['query_key'] == 'python|austin|'
+    assert mark['job_key'] == 'abc'
+
+
+def test_mark_from_a_newer_crawl_is_not_applied(tmp_path):
+    csv_file = tmp_path / 'jobs.csv'
+    loaded = write_csv(csv_file, ['Python Developer'])
+    # A crawl finishes while the loader is inserting the rows it read.
+    write_csv(csv_file, ['Python Developer', 'Data Engineer'])
+    write_pending_mark(str(csv_file), 'Python', 'Austin', '', 'newer', 2)
+
+    assert read_pending_mark(str(csv_file), loaded) is None
+
+
+def test_saving_a_mark_keeps_a_newer_one(tmp_path, monkeypatch):
+    saved = []
+    monkeypatch.setattr(crawl_state, 'save_high_water', lambda connection, *args: saved.append(args))
+    csv_file = tmp_path / 'jobs.csv'
+    loaded = write_csv(csv_file, ['Python Developer'])
+    write_pending_mark(str(csv_file), 'Python', 'Austin', '', 'abc', 1)
+    mark = read_pending_mark(str(csv_file), loaded)
+
+    write_csv(csv_file, ['Data Engineer'])
+    write_pending_mark(str(csv_file), 'Python', 'Austin', '', 'newer', 1)
+    save_pending_mark(None, str(csv_file), mark)
+
+    assert saved == [('python|austin|', 'abc', 1)]
+    assert (tmp_path / pending_mark_path('jobs.csv')).exists()
+
+    save_pending_mark(None, str(csv_file), read_pending_mark(str(csv_file), csv_file.read_bytes()))
+    assert not (tmp_path / pending_mark_path('jobs.csv')).exists()
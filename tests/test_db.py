@@ -0,0 +1,28 @@
+import threading
+import time
+
+import tasks.db as db
+
+
+def test_concurrent_first_use_builds_one_pool(monkeypatch):
+    built = []
+
+    class SlowPool:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)  # MySQLConnectionPool opens every connection here
+            built.append(self)
+
+    monkeypatch.setattr(db.pooling, 'MySQLConnectionPool', SlowPool)
+    db.reset_pool()
+    try:
+        pools = []
+        threads = [threading.Thread(target=lambda: pools.append(db.get_pool())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(built) == 1
+        assert all(pool is built[0] for pool in pools)
+    finally:
+        db.reset_pool()
@@ -0,0 +1,68 @@
+import pytest
+
+from tasks.dedupe import NearDuplicateIndex, band_keys, locations_compatible, signature
+
+SNIPPET = 'Build and maintain backend services in Python and Django for our hiring platform'
+
+
+def index_with(title, company, location, description):
+    index = NearDuplicateIndex()
+    sig = signature(title, description)
+    index.add(1, title, company, location, description, sig, band_keys(sig))
+    return index
+
+
+def find(index, title, company, location, description):
+    sig = signature(title, description)
+    return index.find(title, company, location, description, sig, band_keys(sig))
+
+
+@pytest.mark.parametrize('original, repost', [
+    (('Senior Python Developer', 'Acme', 'Remote', SNIPPET),
+     ('Sr. Python Developer', 'Acme', 'Remote', SNIPPET + '.')),
+    (('Python Developer', 'Acme', 'Remote', SNIPPET),
+     ('Python Developer', 'Acme', 'Remote in Austin, TX', SNIPPET)),
+    (('Python Developer', 'Acme Corp', 'Austin, TX', SNIPPET),
+     ('Python Developer - Remote', 'ACME Corp', 'Austin, TX 78701', SNIPPET)),
+])
+def test_reposts_are_matched(original, repost):
+    assert find(index_with(*original), *repost) == 1
+
+
+@pytest.mark.parametrize('original, other', [
+    # Different seniority with the same snippet.
+    (('Senior Software Engineer', 'Acme', 'Remote', SNIPPET),
+     ('Software Engineer', 'Acme', 'Remote', SNIPPET)),
+    # Different specialty and no description.
+    (('Registered Nurse - ICU', 'St. Mary', 'Austin, TX', 'N/A'),
+     ('Registered Nurse - ER', 'St. Mary', 'Austin, TX', 'N/A')),
+    # Same role in another city.
+    (('Python Developer', 'Acme', 'Austin, TX', SNIPPET),
+     ('Python Developer', 'Acme', 'Dallas, TX', SNIPPET)),
+    # Same role at another company.
+    (('Python Developer', 'Acme', 'Remote', SNIPPET),
+     ('Python Developer', 'Globex', 'Remote', SNIPPET)),
+    # Unknown company.
+    (('Python Developer', 'N/A', 'Remote', SNIPPET),
+     ('Python Developer', 'N/A', 'Remote', SNIPPET)),
+])
+def test_distinct_postings_are_kept(original, other):
+    assert find(index_with(*original), *other) is None
+
+
+def test_empty_description_needs_near_identical_title():
+    index = index_with('Registered Nurse', 'St. Mary', 'Austin, TX', 'N/A')
+
+    assert find(index, 'Registered Nurse', 'St. Mary', 'Austin, TX', '') == 1
+    assert find(index, 'Registered Nurse Travel', 'St. Mary', 'Austin, TX', '') is None
+
+
+@pytest.mark.parametrize('a, b, expected', [
+    ('Remote', 'Remote in Austin, TX', True),
+    ('Austin, TX', 'Austin, TX', True),
+    ('Austin, TX', 'Dallas, TX', False),
+    ('N/A', 'Austin, TX', False),
+    ('N/A', '', True),
+])
+def test_locations_compatible(a, b, expected):
+    assert locations_compatible(a, b) is expected
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from tasks.normalize import normalize_job, parse_posted_dates, parse_salaries
+
+NOW = datetime(2024, 1, 31, 12, 0)
+
+
+def parse_salary(text):
+    row = parse_salaries(pd.Series([text])).iloc[0]
+    return tuple(None if pd.isna(value) else value for value in row)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('$50,000 - $70,000 a year', (50000.0, 70000.0, 'year', 60000.0)),
+    ('$60K - $80K a year', (60000.0, 80000.0, 'year', 70000.0)),
+    ('$50 an hour', (50.0, 50.0, 'hour', 104000.0)),
+    ('$45.50 per hour', (45.5, 45.5, 'hour', 94640.0)),
+    ('Up to $25 an hour', (None, 25.0, 'hour', 52000.0)),
+    ('From $4,000 a month', (4000.0, None, 'month', 48000.0)),
+    ('Starting at $20 an hour', (20.0, None, 'hour', 41600.0)),
+    ('$55,000', (55000.0, 55000.0, None, None)),
+    ('Competitive', (None, None, None, None)),
+    ('N/A', (None, None, None, None)),
+    ('', (None, None, None, None)),
+])
+def test_parse_salaries(text, expected):
+    assert parse_salary(text) == expected
+
+
+def test_parse_salaries_keeps_missing_values():
+    salaries = parse_salaries(pd.Series([None, '$50 an hour'], index=[7, 9]))
+
+    assert list(salaries.index) == [7, 9]
+    assert salaries['salary_annual'].isna().tolist() == [True, False]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Posted 3 days ago', datetime(2024, 1, 28, 12, 0)),
+    ('EmployerActive 2 days ago', datetime(2024, 1, 29, 12, 0)),
+    ('30+ days ago', datetime(2024, 1, 1, 12, 0)),
+    ('Active 5 hours ago', datetime(2024, 1, 31, 7, 0)),
+    ('10 minutes ago', datetime(2024, 1, 31, 11, 50)),
+    ('Just posted', NOW),
+    ('Today', NOW),
+    ('N/A', None),
+    ('last week', None),
+    (None, None),
+])
+def test_parse_posted_dates(text, expected):
+    posted_at = parse_posted_dates(pd.Series([text]), now=NOW).iloc[0]
+
+    assert (None if pd.isna(posted_at) else posted_at.to_pydatetime()) == expected
+
+
+def test_normalize_job_returns_floats_for_salaries():
+    normalized = normalize_job({'salary': '$50 an hour', 'posted_date': 'Today'}, now=NOW)
+
+    assert normalized == {
+        'salary_min': 50.0, 'salary_max': 50.0, 'salary_period': 'hour',
+        'salary_annual': 104000.0, 'posted_at': NOW
+    }
+    assert all(type(normalized[column]) is float for column in ['salary_min', 'salary_max', 'salary_annual'])
+
+
+def test_normalize_job_without_values():
+    normalized = normalize_job({'salary': 'N/A', 'posted_date': 'N/A'}, now=NOW)
+
+    assert normalized == dict.fromkeys(normalized, None)
@@ -0,0 +1,135 @@
+import pytest
+
+import tasks.task1_scraper as scraper_module
+from tasks.task1_scraper import MAX_BLOCK_RETRIES, PAGE_BLOCKED, PAGE_EMPTY, IndeedScraper
+from tasks.throttle import MAX_WAIT, AdaptiveThrottle, parse_retry_after
+
+URL = 'https://www.indeed.com/jobs?q=python'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def throttle(clock):
+    return AdaptiveThrottle(initial_rate=1.0, min_rate=0.1, max_rate=2.0, increase=0.25, decrease=0.5,
+                            clock=clock, sleep=clock.sleep)
+
+
+def rate(throttle):
+    return throttle.stats()['www.indeed.com']['rate']
+
+
+def test_success_increases_rate_up_to_max(throttle):
+    throttle.record_success(URL)
+    assert rate(throttle) == 1.25
+
+    for _ in range(10):
+        throttle.record_success(URL)
+    assert rate(throttle) == 2.0
+
+
+def test_block_halves_rate_down_to_min(throttle):
+    throttle.record_block(URL, 'http 429')
+    assert rate(throttle) == 0.5
+
+    for _ in range(10):
+        throttle.record_block(URL, 'http 429')
+    assert rate(throttle) == 0.1
+    assert throttle.stats()['www.indeed.com']['blocks'] == 11
+
+
+def test_wait_spaces_requests_by_current_rate(throttle, clock):
+    assert throttle.wait(URL)
+    assert throttle.wait(URL)
+    assert clock.slept == [1.0]
+
+    throttle.record_block(URL, 'captcha')
+    assert throttle.wait(URL)
+    assert clock.slept == [1.0, 2.0]
+
+
+def test_retry_after_delays_next_request(throttle, clock):
+    throttle.record_block(URL, 'http 503', retry_after=120)
+
+    assert throttle.wait(URL)
+    assert clock.slept == [120]
+    assert throttle.stats()['www.indeed.com']['block_events'][0]['retry_after'] == 120
+
+
+def test_wait_refuses_slots_beyond_max_wait(throttle, clock):
+    throttle.record_block(URL, 'http 429', retry_after=MAX_WAIT + 1)
+
+    assert not throttle.wait(URL)
+    assert clock.slept == []
+
+
+@pytest.mark.parametrize('value, expected', [('30', 30.0), ('-5', 0.0), (None, None),
+                                             ('Wed, 21 Oct 2015 07:28:00 GMT', None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_scraper_gives_up_after_max_block_retries(throttle, monkeypatch):
+    scraper = IndeedScraper('python', 'Austin', throttle=throttle)
+    calls = []
+
+    def blocked(url):
+        calls.append(url)
+        throttle.record_block(url, 'http 429')
+        return PAGE_BLOCKED
+
+    monkeypatch.setattr(scraper, 'scrape_page', blocked)
+
+    assert scraper.scrape_all_pages(max_pages=5) == []
+    assert len(calls) == MAX_BLOCK_RETRIES
+    assert scraper.blocked
+
+
+def test_scraper_gives_up_when_slot_is_too_far_away(throttle, monkeypatch):
+    throttle.record_block('https://www.indeed.com/jobs', 'http 429', retry_after=MAX_WAIT + 1)
+    scraper = IndeedScraper('python', 'Austin', throttle=throttle)
+    monkeypatch.setattr(scraper, 'scrape_page', lambda url: pytest.fail('should not fetch'))
+
+    scraper.scrape_all_pages(max_pages=5)
+
+    assert scraper.blocked
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.mark.parametrize('content, outcome', [
+    # End of results on a page that happens to load reCAPTCHA.
+    (b'<html><head><script src="https://www.google.com/recaptcha/api.js"></script></head>'
+     b'<body>No more jobs</body></html>', PAGE_EMPTY),
+    (b'<html><head><title>Just a moment...</title></head><body></body></html>', PAGE_BLOCKED),
+    (b'<html><body><h1>Additional Verification Required</h1></body></html>', PAGE_BLOCKED),
+])
+def test_only_challenge_pages_count_as_blocked(throttle, monkeypatch, content, outcome):
+    monkeypatch.setattr(scraper_module.requests, 'get', lambda *args, **kwargs: FakeResponse(content))
+    scraper = IndeedScraper('python', 'Austin', throttle=throttle)
+
+    assert scraper.scrape_page(URL) == outcome